@@ -1,4 +1,5 @@
-from qiskit import QuantumCircuit, Aer, execute
+from qiskit import QuantumCircuit
+from qiskit_aer import AerSimulator
 
 # Create a quantum coin flip circuit
 qc = QuantumCircuit(1, 1)
@@ -6,8 +7,8 @@ qc.h(0)
 qc.measure(0, 0)
 
 # Run on simulator
-backend = Aer.get_backend('qasm_simulator')
-job = execute(qc, backend, shots=10)
+sim = AerSimulator()
+result = sim.run(qc, shots=10).result()
 
 # Get counts
-print(job.result().get_counts())
+print(result.get_counts())
@@ -1,109 +1,113 @@
 # bb84_demo.py
-# Replace deprecated Aer/execute imports with AerSimulator
-import random
-from qiskit import QuantumCircuit
-from qiskit_aer import AerSimulator
-from collections import namedtuple
+import numpy as np
+from collections import Counter
 
-def prepare_qubit(bit, basis):
-    # basis: 0 = Z (computational), 1 = X (Hadamard)
-    qc = QuantumCircuit(1, 1)
+# Qiskit/Aer are only needed for the use_simulator path, so they are imported on first use
+_SIM = None
+
+def _sim():
+    """Shared local AerSimulator instance (batched circuits run in parallel), created on first use."""
+    global _SIM
+    if _SIM is None:
+        from qiskit_aer import AerSimulator
+        _SIM = AerSimulator(max_parallel_experiments=0)
+    return _SIM
+
+def bb84_circuit(bit, a_basis, b_basis):
+    # one round: Alice prepares `bit` in `a_basis`, Bob measures in `b_basis`
+    from qiskit import QuantumCircuit
+    qc = QuantumCircuit(1,1)
+    # Alice prepares
     if bit == 1:
         qc.x(0)
-    if basis == 1:
+    if a_basis == 1:
+        qc.h(0)
+    # If Bob measures in X basis, apply H before measurement (to rotate basis)
+    if b_basis == 1:
         qc.h(0)
-    qc.measure(0, 0)
+    qc.measure(0,0)
     return qc
 
-def alice_prepare(bits, bases):
-    # returns list of circuits (one-shot each)
-    return [prepare_qubit(b, bs) for b, bs in zip(bits, bases)]
+def simulate_bob_results(alice_bits, alice_bases, bob_bases):
+    # Each round is one of at most 8 (bit, alice_basis, bob_basis) patterns, so simulate
+    # every distinct pattern once in a single job with enough shots for all its rounds,
+    # then hand the per-shot samples (memory) back out in round order.
+    rounds = list(zip(alice_bits.tolist(), alice_bases.tolist(), bob_bases.tolist()))
+    if not rounds:
+        return np.empty(0, dtype=np.uint8)
+    patterns = Counter(rounds)
+    keys = list(patterns)
+    circuits = [bb84_circuit(*k) for k in keys]
+    result = _sim().run(circuits, shots=max(patterns.values()), memory=True).result()
+    samples = {k: iter(result.get_memory(i)) for i, k in enumerate(keys)}
+    return np.array([int(next(samples[r])) for r in rounds], dtype=np.uint8)
 
-def bob_measure(circuits, bob_bases):
-    backend = Aer.get_backend('qasm_simulator')
-    results = []
-    for qc, basis in zip(circuits, bob_bases):
-        # to measure in X basis, apply H before measurement
-        if basis == 1:
-            qc2 = QuantumCircuit(1,1)
-            # recreate state: circuits already have the prepare + measure, but prepared with measurement in them.
-            # Instead of reusing the prepared circuit (which includes measurement), we will construct a circuit replicating preparation.
-            # Simpler approach: build a single circuit for each qubit combining preparation and measurement basis
-            # Here we assume `qc` already contains prepare+measure; to simulate measurement in Bob's basis we should have constructed circuits differently.
-            pass
-
-    # Simpler (clean) approach: re-implement preparation and measurement per bit:
-    alice_bits = [c._data for c in circuits]  # not used - we'll instead rebuild from inputs; so change approach below
-    return []
-
-# We'll re-implement cleanly without trying to reuse circuits objects.
-def bb84_protocol(n_bits=64):
-    sim = AerSimulator()
-    # Alice chooses random bits and bases
-    alice_bits = [random.randint(0,1) for _ in range(n_bits)]
-    alice_bases = [random.randint(0,1) for _ in range(n_bits)]
-    # Bob chooses bases
-    bob_bases = [random.randint(0,1) for _ in range(n_bits)]
-    bob_results = []
-    for bit, a_basis, b_basis in zip(alice_bits, alice_bases, bob_bases):
-        qc = QuantumCircuit(1,1)
-        # Alice prepares
-        if bit == 1:
-            qc.x(0)
-        if a_basis == 1:
-            qc.h(0)
-        # If Bob measures in X basis, apply H before measurement (to rotate basis)
-        if b_basis == 1:
-            qc.h(0)
-        qc.measure(0,0)
-        # use AerSimulator.run instead of execute/Aer backend
-        result = sim.run(qc, shots=1).result()
-        counts = result.get_counts()
-        measured = int(next(iter(counts)))
-        bob_results.append(measured)
+def _sift_and_reveal(alice_bits, alice_bases, bob_bases, bob_results, uniforms):
     # Sifting: keep only positions where bases match
-    key_positions = [i for i, (a,b) in enumerate(zip(alice_bases, bob_bases)) if a==b]
-    sifted_alice = [alice_bits[i] for i in key_positions]
-    sifted_bob   = [bob_results[i] for i in key_positions]
-    # Optionally do error-checking: reveal a random subset of bits to estimate error rate
-    # For demo, we'll reveal first 10% or at least 1 bit
-    reveal_k = max(1, len(sifted_alice)//10)
-    reveal_indices = random.sample(range(len(sifted_alice)), reveal_k) if len(sifted_alice)>0 else []
-    revealed_alice = [sifted_alice[i] for i in reveal_indices]
-    revealed_bob = [sifted_bob[i] for i in reveal_indices]
+    n = alice_bits.shape[0]
+    positions = np.empty(n, dtype=np.int64)
+    m = 0
+    for i in range(n):
+        if alice_bases[i] == bob_bases[i]:
+            positions[m] = i
+            m += 1
+    positions = positions[:m]
+    # Error-checking: reveal a random 10% (at least 1 bit) of the sifted key,
+    # picked by a partial Fisher-Yates shuffle driven by `uniforms` in [0, 1)
+    reveal_k = max(1, m // 10) if m > 0 else 0
+    order = np.arange(m)
+    for i in range(reveal_k):
+        j = i + int(uniforms[i] * (m - i))
+        order[i], order[j] = order[j], order[i]
+    revealed = order[:reveal_k].copy()
+    keep = np.ones(m, dtype=np.bool_)
+    for i in range(reveal_k):
+        keep[revealed[i]] = False
     # Remove revealed bits from key
-    final_alice_key = [b for idx,b in enumerate(sifted_alice) if idx not in reveal_indices]
-    final_bob_key   = [b for idx,b in enumerate(sifted_bob) if idx not in reveal_indices]
+    key_alice = np.empty(m - reveal_k, dtype=np.uint8)
+    key_bob = np.empty(m - reveal_k, dtype=np.uint8)
+    k = 0
+    for i in range(m):
+        if keep[i]:
+            key_alice[k] = alice_bits[positions[i]]
+            key_bob[k] = bob_results[positions[i]]
+            k += 1
+    return positions, revealed, key_alice, key_bob
+
+def bb84_protocol(n_bits=64, use_simulator=False):
+    rng = np.random.default_rng()
+    # Alice chooses random bits and bases; Bob chooses bases
+    alice_bits, alice_bases, bob_bases = rng.integers(0, 2, size=(3, n_bits), dtype=np.uint8)
+    if use_simulator:
+        bob_results = simulate_bob_results(alice_bits, alice_bases, bob_bases)
+    else:
+        # Same statistics without a simulator: a matching basis reads back Alice's bit,
+        # a mismatched basis gives a fair coin flip independent of it.
+        bob_results = np.where(alice_bases == bob_bases, alice_bits,
+                               rng.integers(0, 2, size=n_bits, dtype=np.uint8))
+    # Sifting, error-check reveal and key extraction
+    key_positions, reveal_indices, final_alice_key, final_bob_key = _sift_and_reveal(
+        alice_bits, alice_bases, bob_bases, bob_results, rng.random(n_bits))
+    sifted_alice = alice_bits[key_positions]
+    sifted_bob   = bob_results[key_positions]
     return {
-        'alice_bits': alice_bits,
-        'alice_bases': alice_bases,
-        'bob_bases': bob_bases,
-        'bob_results': bob_results,
-        'sifted_positions': key_positions,
-        'sifted_alice': sifted_alice,
-        'sifted_bob': sifted_bob,
-        'revealed_indices': reveal_indices,
-        'revealed_alice': revealed_alice,
-        'revealed_bob': revealed_bob,
-        'final_alice_key': final_alice_key,
-        'final_bob_key': final_bob_key
+        'alice_bits': alice_bits.tolist(),
+        'alice_bases': alice_bases.tolist(),
+        'bob_bases': bob_bases.tolist(),
+        'bob_results': bob_results.tolist(),
+        'sifted_positions': key_positions.tolist(),
+        'sifted_alice': sifted_alice.tolist(),
+        'sifted_bob': sifted_bob.tolist(),
+        'revealed_indices': reveal_indices.tolist(),
+        'revealed_alice': sifted_alice[reveal_indices].tolist(),
+        'revealed_bob': sifted_bob[reveal_indices].tolist(),
+        'final_alice_key': final_alice_key.tolist(),
+        'final_bob_key': final_bob_key.tolist()
     }
 
 def bits_to_hex(bits):
-    # pack into bytes and return hex
-    b = 0
-    out = []
-    for i,bit in enumerate(bits):
-        b = (b << 1) | bit
-        if (i+1) % 8 == 0:
-            out.append(b)
-            b = 0
-    # leftover
-    rem = (8 - (len(bits)%8)) % 8
-    if rem:
-        b = b << rem
-        out.append(b)
-    return ''.join(f"{x:02x}" for x in out)
+    # pack into bytes (MSB first, last byte zero-padded) and return hex
+    return np.packbits(np.asarray(bits, dtype=np.uint8)).tobytes().hex()
 
 def main():
     res = bb84_protocol(64)
@@ -17,13 +17,19 @@ Run:
 import math
 import random
 import numpy as np
-from qiskit import QuantumCircuit
+from qiskit import QuantumCircuit, transpile
+from qiskit.circuit.library import DiagonalGate
 from qiskit_aer import AerSimulator
 
 # ---------- Config ----------
-SIM = AerSimulator()
-MAX_QUBITS = 4   # limit for safety and speed (2^4 = 16 items)
+SIM = AerSimulator(method='statevector')
+USE_GPU = 'GPU' in SIM.available_devices()  # qiskit-aer-gpu installed and a device present
+if USE_GPU:
+    # statevector on the GPU through cuStateVec, with shots batched there too
+    SIM.set_options(device='GPU', cuStateVec_enable=True, batched_shots_gpu=True)
+MAX_QUBITS = 12 if USE_GPU else 4   # limit for safety and speed (2^4 = 16 items on CPU)
 SHOTS = 2000
+DENSE_MAX_QUBITS = 4   # up to 2^4 = 16 amplitudes: apply oracle/diffusion as single dense gates
 # ----------------------------
 
 def human_readable_large(n):
@@ -44,62 +50,68 @@ def grover_iterations(n_qubits):
     return max(1, int(math.floor((math.pi/4) * math.sqrt(N))))
 
 def build_phase_oracle(n_qubits, target_index, qc, ancillas):
-    bits = format(target_index, f'0{n_qubits}b')
-    for i, b in enumerate(bits):
-        if b == '0':
-            qc.x(i)
-    if n_qubits == 1:
-        qc.z(0)
-    elif n_qubits == 2:
-        qc.cz(0,1)
-    else:
-        controls = list(range(0, n_qubits-1))
-        target = n_qubits-1
-        qc.h(target)
-        qc.mcx(controls, target, ancillas, mode='basic')
-        qc.h(target)
-    for i, b in enumerate(bits):
-        if b == '0':
-            qc.x(i)
+    if n_qubits <= DENSE_MAX_QUBITS:
+        # phase flip on |target_index> as one diagonal gate
+        oracle_diag = np.ones(2**n_qubits)
+        oracle_diag[target_index] = -1
+        qc.append(DiagonalGate(oracle_diag.tolist()), list(range(n_qubits)))
+        return
+    # the H-MCX-H block flips the phase of |1...1>; X on every qubit whose bit of target_index
+    # is 0 (bit i read LSB-first, since Qiskit's qubit i is bit i) moves |target_index> there
+    bits = format(target_index, f'0{n_qubits}b')[::-1]
+    zeros = [i for i, b in enumerate(bits) if b == '0']
+    if zeros:
+        qc.x(zeros)
+    controls = list(range(0, n_qubits-1))
+    target = n_qubits-1
+    qc.h(target)
+    qc.mcx(controls, target, ancillas, mode='basic')
+    qc.h(target)
+    if zeros:
+        qc.x(zeros)
 
 def build_diffusion(n_qubits, qc, ancillas):
     if n_qubits == 0:
         return
-    for i in range(n_qubits):
-        qc.h(i)
-    for i in range(n_qubits):
-        qc.x(i)
-    if n_qubits == 1:
-        qc.z(0)
-    elif n_qubits == 2:
-        qc.cz(0,1)
-    else:
-        target = n_qubits - 1
-        controls = list(range(0, n_qubits-1))
-        qc.h(target)
-        qc.mcx(controls, target, ancillas, mode='basic')
-        qc.h(target)
-    for i in range(n_qubits):
-        qc.x(i)
-    for i in range(n_qubits):
-        qc.h(i)
+    if n_qubits <= DENSE_MAX_QUBITS:
+        # inversion about the mean, 2|s><s| - I, as one unitary
+        N = 2**n_qubits
+        D = 2*np.full((N, N), 1/N) - np.eye(N)
+        qc.unitary(D, list(range(n_qubits)), label='D')
+        return
+    qubits = list(range(n_qubits))
+    qc.h(qubits)
+    qc.x(qubits)
+    target = n_qubits - 1
+    controls = list(range(0, n_qubits-1))
+    qc.h(target)
+    qc.mcx(controls, target, ancillas, mode='basic')
+    qc.h(target)
+    qc.x(qubits)
+    qc.h(qubits)
+
+def build_grover_step(n_qubits, target_index, ancillas):
+    """One Grover iteration (oracle + diffusion) as a reusable sub-circuit."""
+    step = QuantumCircuit(n_qubits + len(ancillas))
+    build_phase_oracle(n_qubits, target_index, step, ancillas)
+    build_diffusion(n_qubits, step, ancillas)
+    return step
 
 def run_grover(n_qubits, target_index):
     if n_qubits < 1 or n_qubits > MAX_QUBITS:
         raise ValueError(f"n_qubits must be between 1 and {MAX_QUBITS}")
     N = 2**n_qubits
-    ancilla_count = max(0, n_qubits - 2)
+    ancilla_count = 0 if n_qubits <= DENSE_MAX_QUBITS else max(0, n_qubits - 2)
     total_qubits = n_qubits + ancilla_count
     qc = QuantumCircuit(total_qubits, n_qubits)
-    for i in range(n_qubits):
-        qc.h(i)
+    qc.h(list(range(n_qubits)))
     r = grover_iterations(n_qubits)
+    step = build_grover_step(n_qubits, target_index, list(range(n_qubits, total_qubits)))
     for _ in range(r):
-        build_phase_oracle(n_qubits, target_index, qc, list(range(n_qubits, total_qubits)))
-        build_diffusion(n_qubits, qc, list(range(n_qubits, total_qubits)))
-    for i in range(n_qubits):
-        qc.measure(i, i)
-    result = SIM.run(qc, shots=SHOTS).result()
+        qc.compose(step, inplace=True)
+    qc.measure(list(range(n_qubits)), list(range(n_qubits)))
+    # transpile once for the simulator (also lowers the ancilla MCX for n_qubits > 2)
+    result = SIM.run(transpile(qc, SIM, optimization_level=1), shots=SHOTS).result()
     counts = result.get_counts()
     return counts, r, qc
 
@@ -3,27 +3,29 @@ import random
 from qiskit import QuantumCircuit
 from qiskit_aer import AerSimulator
 from collections import Counter
+import numpy as np
 
-def roll_die_once():
-    sim = AerSimulator()
+SIM = AerSimulator()  # shared local simulator instance
+
+def die_source(batch=4096):
+    # pre-roll `batch` 3-qubit values per simulator run and hand them out one at a time
     qc = QuantumCircuit(3, 3)
     # Put 3 qubits into superposition (0..7)
     for i in range(3):
         qc.h(i)
     qc.measure([0,1,2], [0,1,2])
-    # use AerSimulator.run instead of execute/Aer backend
-    result = sim.run(qc, shots=1).result()
-    counts = result.get_counts()
-    measured = list(counts.keys())[0]  # e.g., '010'
-    val = int(measured, 2)
-    return val
+    while True:
+        # per-shot memory keeps the rolls in sampled order
+        memory = SIM.run(qc, shots=batch, memory=True).result().get_memory()
+        values = np.fromiter((int(s, 2) for s in memory), dtype=np.uint8, count=batch)
+        # rejection sampling: keep only values in 0..5
+        for v in values[values < 6]:
+            yield int(v) + 1  # map 0->1, ..., 5->6
+
+_ROLLS = die_source()
 
 def roll_die():
-    # rejection sampling: keep rolling until value in 0..5
-    while True:
-        v = roll_die_once()
-        if v < 6:
-            return v + 1  # map 0->1, ..., 5->6
+    return next(_ROLLS)
 
 def main():
     n = 20
@@ -16,77 +16,77 @@ WARNING: This demo is only for learning on generated/test passwords.
 Do NOT use this to attack or access systems you don't own.
 """
 
+import functools
 import math
-import random
+import secrets
 import sys
 import numpy as np
 import hashlib  # Added: map arbitrary password -> index via SHA-256
 import base64  # NEW: encode/decode ciphertext
-from qiskit import QuantumCircuit
-from qiskit_aer import AerSimulator  # use AerSimulator for local simulation
-from qiskit.quantum_info import Statevector
+# Qiskit is imported on first use (the RNG and encryption parts run on NumPy alone), and
+# qiskit_aer only by quantum_random_bits(use_simulator=True); the Grover part never runs a circuit
 #from qiskit.visualization import plot_histogram  # optional; not required for headless demo
 
 # -------------- Configuration --------------
-SIM = AerSimulator()               # local simulator instance
 MAX_GROVER_QUBITS = 4   # maximum qubits for Grover demo => search space size 2^4 = 16
 # -------------------------------------------
 
+_SIM = None
+
+def _sim():
+    """Local AerSimulator for quantum_random_bits(use_simulator=True), created (and qiskit_aer imported) on first use."""
+    global _SIM
+    if _SIM is None:
+        from qiskit_aer import AerSimulator
+        _SIM = AerSimulator(method='statevector')
+    return _SIM
+
+def pack_bits(bits):
+    """Pack a bit list into bytes (MSB first within each byte, zero-padded to a multiple of 8)."""
+    return np.packbits(np.asarray(bits, dtype=np.uint8)).tobytes()
+
 # Helper: convert bitlist to hex / readable string
 def bits_to_hex_str(bits):
-    # pack into bytes (MSB first within each byte) and return hex
-    n = len(bits)
-    # pad to multiple of 8
-    pad = (8 - (n % 8)) % 8
-    bits = bits + [0] * pad
-    b = 0
-    out = []
-    for i,bit in enumerate(bits):
-        b = (b << 1) | int(bit)
-        if (i + 1) % 8 == 0:
-            out.append(b)
-            b = 0
-    return ''.join(f"{x:02x}" for x in out)
+    # pack into bytes and return hex
+    return pack_bits(bits).hex()
+
+def bits_to_int(bits):
+    # MSB-first bit list -> integer, without building an intermediate '0101' string
+    v = 0
+    for b in bits:
+        v = (v << 1) | int(b)
+    return v
+
+# 256-entry lookup table: byte -> itself if printable ASCII, else its "\xNN" escape
+_ASCII_TABLE = [chr(i) if 32 <= i <= 126 else f"\\x{i:02x}" for i in range(256)]
 
 def bits_to_ascii(bits):
-    # try to convert bits to ascii string (8-bit per char)
-    pad = (8 - (len(bits) % 8)) % 8
-    bits = bits + [0]*pad
-    s = ""
-    for i in range(0, len(bits), 8):
-        byte = bits[i:i+8]
-        val = 0
-        for bit in byte:
-            val = (val << 1) | int(bit)
-        if 32 <= val <= 126:
-            s += chr(val)
-        else:
-            s += f"\\x{val:02x}"
-    return s
+    # try to convert bits to ascii string (8-bit per char); escape non-printable bytes
+    return pack_bits(bits).decode('latin-1').translate(_ASCII_TABLE)
+
+def counts_from_probs(probs, shots, n_bits):
+    """Draw all shots at once from an exact outcome distribution; returns a counts dict keyed like Aer's."""
+    draws = np.random.default_rng().multinomial(shots, probs)
+    return {format(i, f'0{n_bits}b'): int(c) for i, c in enumerate(draws) if c}
 
 # ----------------- Part 1: Quantum RNG -----------------
-def quantum_random_bits(n_bits):
+def quantum_random_bits(n_bits, use_simulator=False):
     """
-    Generate n_bits using single-qubit Hadamard sampling in batches.
-    Uses AerSimulator to get measurement counts and expands them to bits.
+    Generate n_bits of Hadamard-coin randomness.
+    A measured |+> qubit is a fair coin, so by default the bits are drawn directly with NumPy.
+    With use_simulator=True they are sampled from a single-qubit Hadamard circuit in one
+    n_bits-shot AerSimulator run (per-shot memory, so bits come back in sampled order).
     """
-    bits = []
-    shots = 1024
-    runs = math.ceil(n_bits / shots)
-    for _ in range(runs):
-        # prepare circuit: apply H and measure many times
-        qc = QuantumCircuit(1, 1)
-        qc.h(0)
-        qc.measure(0, 0)
-        result = SIM.run(qc, shots=shots).result()
-        counts = result.get_counts()
-        # counts like {'0': 512, '1': 512}
-        for bit_str, cnt in counts.items():
-            b = int(bit_str)
-            bits.extend([b] * cnt)
-            if len(bits) >= n_bits:
-                return bits[:n_bits]
-    return bits[:n_bits]
+    if not use_simulator:
+        return np.random.default_rng().integers(0, 2, size=n_bits, dtype=np.uint8).tolist()
+    from qiskit import QuantumCircuit
+    # prepare circuit: apply H and measure many times
+    qc = QuantumCircuit(1, 1)
+    qc.h(0)
+    qc.measure(0, 0)
+    memory = _sim().run(qc, shots=n_bits, memory=True).result().get_memory()
+    # memory like ['0', '1', '1', ...], one entry per shot
+    return np.fromiter((int(s) for s in memory), dtype=np.uint8, count=n_bits).tolist()
 
 def generate_quantum_password(bit_len=32, human_readable=True):
     bits = quantum_random_bits(bit_len)
@@ -111,26 +111,56 @@ def generate_quantum_password(bit_len=32, human_readable=True):
 
 def make_diffusion(n_qubits):
     """Construct standard diffusion (inversion about mean) operator on n_qubits."""
+    from qiskit import QuantumCircuit
     qc = QuantumCircuit(n_qubits)
-    # H on all
-    for i in range(n_qubits):
-        qc.h(i)
-    # X on all
-    for i in range(n_qubits):
-        qc.x(i)
-    # Multi-controlled Z on all-1s
     if n_qubits == 1:
-        qc.z(0)
-    elif n_qubits == 2:
+        # H X Z X H = -X: the whole single-qubit diffusion fuses into one X gate
+        qc.x(0)
+        qc.global_phase = math.pi
+        return qc
+    qubits = list(range(n_qubits))
+    # H on all, X on all
+    qc.h(qubits)
+    qc.x(qubits)
+    # Multi-controlled Z on all-1s
+    if n_qubits == 2:
         qc.cz(0,1)
     else:
         raise NotImplementedError("Diffusion for n_qubits>2 not implemented in this small-demo script.")
-    # X on all
-    for i in range(n_qubits):
-        qc.x(i)
-    # H on all
-    for i in range(n_qubits):
-        qc.h(i)
+    # X on all, H on all
+    qc.x(qubits)
+    qc.h(qubits)
+    return qc
+
+def grover_oracle(n_qubits, target_index):
+    """Phase oracle marking target_index on 1 or 2 qubits."""
+    from qiskit import QuantumCircuit
+    qc = QuantumCircuit(n_qubits)
+    if n_qubits == 1:
+        # oracle: flip phase of |1> if target==1
+        if target_index == 1:
+            qc.z(0)
+    elif n_qubits == 2:
+        # the H-CX-H below is a CZ, which marks |11>; reversing the MSB-first string gives
+        # bits[i] = bit i of target_index for qubit i, and X on its 0 bits maps the target onto |11>
+        bits = format(target_index, '02b')[::-1]
+        zeros = [i for i, b in enumerate(bits) if b == '0']
+        # map zeros to X
+        if zeros:
+            qc.x(zeros)
+        # controlled-Z via H+CX+H on last qubit
+        qc.h(n_qubits-1)
+        qc.cx(0, n_qubits-1)
+        qc.h(n_qubits-1)
+        # undo X
+        if zeros:
+            qc.x(zeros)
+    return qc
+
+def grover_step(n_qubits, target_index):
+    """One Grover iteration: the oracle for target_index followed by the diffusion."""
+    qc = grover_oracle(n_qubits, target_index)
+    qc.compose(make_diffusion(n_qubits), inplace=True)
     return qc
 
 def grover_search_demo(n_qubits=2, target_index=0, shots=1024):
@@ -146,88 +176,94 @@ def grover_search_demo(n_qubits=2, target_index=0, shots=1024):
     if target_index < 0 or target_index >= N:
         raise ValueError("target_index out of range")
 
+    qc, probs, r = _build_grover_circuit(n_qubits, target_index)
+    # the outcome distribution is exact, so all shots are one multinomial draw from it
+    return counts_from_probs(probs, shots, n_qubits), r, qc
+
+_H = np.array([[1, 1], [1, -1]]) / np.sqrt(2)
+
+def _grover_operator_matrix(n_qubits, target_index):
+    """Dense Grover iteration D @ O on the 2^n amplitudes (small n only)."""
+    N = 2**n_qubits
+    # oracle: phase flip on |target_index>
+    O = np.eye(N)
+    O[target_index, target_index] = -1
+    # diffusion: H^n (2|0><0| - I) H^n
+    H_n = functools.reduce(np.kron, [_H] * n_qubits)
+    e0 = np.zeros(N)
+    e0[0] = 1
+    D = H_n @ (2*np.outer(e0, e0) - np.eye(N)) @ H_n
+    return D @ O
+
+@functools.lru_cache(maxsize=32)
+def _build_grover_circuit(n_qubits, target_index):
+    """
+    Build the measured Grover circuit for (n_qubits, target_index).
+    Cached together with its exact outcome probabilities, so repeated runs for the same
+    target only pay for sampling. Returns (circuit, probabilities, iterations r).
+    """
+    from qiskit import QuantumCircuit
+    N = 2**n_qubits
     # Setup: start in uniform superposition
+    qubits = list(range(n_qubits))
     qc = QuantumCircuit(n_qubits, n_qubits)
-    for i in range(n_qubits):
-        qc.h(i)
+    qc.h(qubits)
 
     # Choose iterations r ≈ floor(pi/4 * sqrt(N))
     r = max(1, int(math.floor((math.pi/4) * math.sqrt(N))))
+    # the oracle's X positions and the diffusion are worked out once, in this single step
+    step = grover_step(n_qubits, target_index)
     for _ in range(r):
-        # oracle
-        if n_qubits == 1:
-            # oracle: flip phase of |1> if target==1
-            if target_index == 1:
-                qc.z(0)
-        elif n_qubits == 2:
-            bits = format(target_index, '02b')
-            # map zeros to X
-            for i,b in enumerate(bits):
-                if b == '0':
-                    qc.x(i)
-            # controlled-Z via H+CX+H on last qubit
-            qc.h(n_qubits-1)
-            qc.cx(0, n_qubits-1)
-            qc.h(n_qubits-1)
-            # undo X
-            for i,b in enumerate(bits):
-                if b == '0':
-                    qc.x(i)
-
-        # diffusion (inline for small n)
-        if n_qubits == 1:
-            qc.h(0)
-            qc.z(0)
-            qc.h(0)
-        elif n_qubits == 2:
-            for i in range(n_qubits):
-                qc.h(i)
-                qc.x(i)
-            qc.h(n_qubits-1)
-            qc.cx(0, n_qubits-1)
-            qc.h(n_qubits-1)
-            for i in range(n_qubits):
-                qc.x(i)
-                qc.h(i)
+        qc.compose(step, inplace=True)
+
+    # Outcome probabilities, indexed like the counts bitstrings: r applications of the
+    # dense Grover operator to the uniform superposition H^n|0>
+    psi = np.full(N, 1/np.sqrt(N))
+    psi = np.linalg.matrix_power(_grover_operator_matrix(n_qubits, target_index), r) @ psi
+    probs = np.abs(psi)**2
 
     # Measure
-    qc.measure(list(range(n_qubits)), list(range(n_qubits)))
-    result = SIM.run(qc, shots=shots).result()
-    counts = result.get_counts()
-    return counts, r, qc
+    qc.measure(qubits, qubits)
+    return qc, probs, r
 
 # --- New: simple key derivation and XOR-based encrypt/decrypt (educational only) ---
 def key_from_bits(bits):
-    """Derive 32-byte key from a list of bits using SHA-256 (educational/demo only)."""
-    bitstr = ''.join(str(int(b)) for b in bits)
-    return hashlib.sha256(bitstr.encode('utf-8')).digest()
+    """Derive 32-byte key from a list of bits using SHA-256 over the packed bytes (educational/demo only)."""
+    return hashlib.sha256(pack_bits(bits)).digest()
 
 def key_from_password_str(pw_str):
     """Derive 32-byte key from an arbitrary password string using SHA-256."""
     return hashlib.sha256(pw_str.encode('utf-8')).digest()
 
+XOR_CHUNK = 1 << 14  # bytes per xor_stream block, small enough to stay cache-resident
+
 def xor_stream(data_bytes, key_bytes):
     """XOR data_bytes with repeated key_bytes stream."""
-    out = bytearray(len(data_bytes))
-    klen = len(key_bytes)
-    for i, b in enumerate(data_bytes):
-        out[i] = b ^ key_bytes[i % klen]
-    return bytes(out)
-
-def encrypt_with_bits(bits, plaintext):
-    """Encrypt plaintext (str) using bits-derived key; return base64 ciphertext str."""
-    key = key_from_bits(bits)
-    pt = plaintext.encode('utf-8')
-    ct = xor_stream(pt, key)
+    d = np.frombuffer(data_bytes, dtype=np.uint8)
+    k = np.frombuffer(key_bytes, dtype=np.uint8)
+    if len(d) == 0:
+        return b''
+    # blocks are a whole number of keys long, so each one starts at key offset 0 and
+    # reuses the same key tile instead of tiling the key over the full input
+    chunk = max(1, XOR_CHUNK // len(k)) * len(k)
+    ktile = np.tile(k, -(-min(chunk, len(d)) // len(k)))
+    out = np.empty_like(d)
+    for i in range(0, len(d), chunk):
+        block = d[i:i+chunk]
+        np.bitwise_xor(block, ktile[:len(block)], out=out[i:i+chunk])
+    return out.tobytes()
+
+def _xor_encrypt_b64(key, plaintext):
+    """XOR-encrypt plaintext (str) with key bytes; return base64 ciphertext str."""
+    ct = xor_stream(plaintext.encode('utf-8'), key)
     return base64.b64encode(ct).decode('ascii')
 
-def decrypt_with_bits(bits, ciphertext_b64):
-    """Decrypt base64 ciphertext string using bits-derived key; return plaintext str."""
+def _xor_decrypt_b64(key, ciphertext_b64):
+    """Decrypt base64 ciphertext str with key bytes; return plaintext str (best-effort decode)."""
     try:
         ct = base64.b64decode(ciphertext_b64)
     except Exception:
         raise ValueError("Invalid base64 ciphertext")
-    key = key_from_bits(bits)
     pt = xor_stream(ct, key)
     try:
         return pt.decode('utf-8', errors='strict')
@@ -235,37 +271,29 @@ def decrypt_with_bits(bits, ciphertext_b64):
         # return best-effort
         return pt.decode('utf-8', errors='replace')
 
+def encrypt_with_bits(bits, plaintext):
+    """Encrypt plaintext (str) using bits-derived key; return base64 ciphertext str."""
+    return _xor_encrypt_b64(key_from_bits(bits), plaintext)
+
+def decrypt_with_bits(bits, ciphertext_b64):
+    """Decrypt base64 ciphertext string using bits-derived key; return plaintext str."""
+    return _xor_decrypt_b64(key_from_bits(bits), ciphertext_b64)
+
 def encrypt_with_password_str(pw_str, plaintext):
-    key = key_from_password_str(pw_str)
-    ct = xor_stream(plaintext.encode('utf-8'), key)
-    return base64.b64encode(ct).decode('ascii')
+    return _xor_encrypt_b64(key_from_password_str(pw_str), plaintext)
 
 def decrypt_with_password_str(pw_str, ciphertext_b64):
-    ct = base64.b64decode(ciphertext_b64)
-    key = key_from_password_str(pw_str)
-    pt = xor_stream(ct, key)
-    try:
-        return pt.decode('utf-8', errors='strict')
-    except Exception:
-        return pt.decode('utf-8', errors='replace')
+    return _xor_decrypt_b64(key_from_password_str(pw_str), ciphertext_b64)
 # --- end new helpers ---
 
 # --- New: toy XOR encrypt/decrypt using integer key (small keyspace) ---
 def toy_xor_encrypt_int_key(key_int, plaintext):
     """Encrypt plaintext (str) with a single-byte integer key; return base64 ciphertext."""
-    key_byte = bytes([key_int & 0xFF])
-    ct = xor_stream(plaintext.encode('utf-8'), key_byte)
-    return base64.b64encode(ct).decode('ascii')
+    return _xor_encrypt_b64(bytes([key_int & 0xFF]), plaintext)
 
 def toy_xor_decrypt_int_key(key_int, ciphertext_b64):
     """Decrypt base64 ciphertext using single-byte integer key; return plaintext."""
-    ct = base64.b64decode(ciphertext_b64)
-    key_byte = bytes([key_int & 0xFF])
-    pt = xor_stream(ct, key_byte)
-    try:
-        return pt.decode('utf-8', errors='strict')
-    except Exception:
-        return pt.decode('utf-8', errors='replace')
+    return _xor_decrypt_b64(bytes([key_int & 0xFF]), ciphertext_b64)
 # --- end new helpers ---
 
 # ----------------- Main interactive demo -----------------
@@ -325,7 +353,7 @@ def main():
         mapping_info = f"Custom password hashed to index {target_index} (mod {N}). Grover will search for this index."
     else:
         target_bits = pw['bits'][:nq]
-        target_index = int(''.join(str(b) for b in target_bits), 2)
+        target_index = bits_to_int(target_bits)
         mapping_info = f"Using first {nq} generated bits {target_bits} -> index {target_index}"
 
     print("\n[INFO] " + mapping_info)
@@ -362,7 +390,7 @@ def main():
         if use_prev:
             toy_key = target_index
         else:
-            toy_key = random.randrange(0, K)
+            toy_key = secrets.randbelow(K)
         print(f"Toy secret key (integer in [0..{K-1}]): {toy_key}")
 
         pt = input("Enter short plaintext to encrypt (default 'HELLO'): ").strip() or "HELLO"
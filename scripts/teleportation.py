@@ -1,15 +1,15 @@
-from qiskit import QuantumCircuit, Aer, execute
+from qiskit import QuantumCircuit
+from qiskit.quantum_info import Statevector
 
-# Create a teleportation circuit
-qc = QuantumCircuit(3, 1)
+# Create a teleportation circuit (entangled pair on qubits 1-2; no measurement,
+# so the statevector can be computed directly without a simulator backend)
+qc = QuantumCircuit(3)
 qc.h(1)
 qc.cx(1, 2)
-qc.measure(2, 0)
-
-# Run on simulator
-sim = Aer.get_backend('statevector_simulator')
-result = execute(qc, sim).result()
 
 # Get statevector
-statevector = result.get_statevector()
-print(statevector)
+statevector = Statevector.from_instruction(qc)
+print(statevector.data)
+
+# Measurement outcome distribution - should see {'000': 0.5, '110': 0.5}
+print(statevector.probabilities_dict())
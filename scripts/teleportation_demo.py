@@ -1,52 +1,58 @@
 # teleportation_demo.py
-from qiskit import QuantumCircuit
-from qiskit.quantum_info import Statevector, DensityMatrix, partial_trace
+import functools
 import numpy as np
 
+@functools.lru_cache(maxsize=None)
+def _fixed_parts():
+    """
+    Parts of the protocol that do not depend on the teleported state, built once on first
+    use (Qiskit is imported here too, not at module load): the entangled pair on q1-q2 as
+    a 2-qubit statevector, and Alice's Bell-basis operations (before measurement) on the
+    full 3-qubit register.
+    """
+    from qiskit import QuantumCircuit
+    from qiskit.quantum_info import Statevector
+    bell = QuantumCircuit(2)
+    bell.h(0); bell.cx(0, 1)
+    bell_pair = Statevector.from_int(0, 2**2).evolve(bell)
+    alice_ops = QuantumCircuit(3)
+    alice_ops.cx(0, 1); alice_ops.h(0)
+    return bell_pair, alice_ops
+
 def teleportation(alpha=1.0, beta=0.0):
+    from qiskit.quantum_info import Statevector, DensityMatrix
+    bell_pair, alice_ops = _fixed_parts()
+
     # normalize
     norm = np.sqrt(abs(alpha)**2 + abs(beta)**2)
     alpha = alpha / norm
     beta = beta / norm
 
-    # Build circuit that prepares the initial state on q0 and an entangled pair on q1-q2
-    c = QuantumCircuit(3)
-    c.initialize([alpha, beta], 0)
-    c.h(1); c.cx(1, 2)
-    # Alice's Bell-basis operations (before measurement)
-    c.cx(0, 1); c.h(0)
+    # Initial state: [alpha, beta] on q0 tensored under the cached pair on q1-q2
+    # (Statevector.tensor puts its argument on the lower qubits), then Alice's operations
+    init = bell_pair.tensor(Statevector([alpha, beta]))
 
-    # Compute full statevector and density matrix before measurement
-    full_sv = Statevector.from_instruction(c)
-    # Use DensityMatrix(full_sv) for compatibility across qiskit versions
-    dm = DensityMatrix(full_sv).data  # numpy array (8x8)
+    # Full statevector before measurement; Qiskit orders qubits little-endian,
+    # so the reshaped axes are (q2, q1, q0)
+    sv = init.evolve(alice_ops).data.reshape(2, 2, 2)
 
     results = {}
     for outcome in ['00', '01', '10', '11']:
-        # projector on qubits 0 and 1 for the given outcome
-        idx = int(outcome, 2)
-        e = np.zeros(4, dtype=complex); e[idx] = 1.0
-        proj2 = np.outer(e, e.conj())        # 4x4 projector for qubits 0&1
-        I = np.eye(2, dtype=complex)         # identity for qubit 2
-        proj_full = np.kron(proj2, I)        # 8x8 projector
-
-        # apply projector, renormalize
-        dm_proj = proj_full @ dm @ proj_full
-        tr = np.trace(dm_proj)
-        if abs(tr) < 1e-12:
+        # Alice's measured bits for qubits 0 and 1
+        b0, b1 = int(outcome[0]), int(outcome[1])
+        # projecting qubits 0,1 onto |b0 b1> leaves Bob's (unnormalized) qubit amplitudes
+        amp = sv[:, b1, b0]
+        p = np.vdot(amp, amp).real
+        if p < 1e-12:
             results[outcome] = None
             continue
-        dm_proj = dm_proj / tr
-
-        # convert to qiskit DensityMatrix and partial-trace out qubits 0 and 1
-        dm_q = DensityMatrix(dm_proj)
-        reduced = partial_trace(dm_q, [0, 1])  # reduced state of qubit 2
-        results[outcome] = reduced
+        # plain 2x2 array here; it is wrapped in a DensityMatrix only for display
+        results[outcome] = np.outer(amp, amp.conj()) / p
 
     # Print results
     print("Teleportation results (reduced state of Bob's qubit for each Alice outcome):")
     for k, v in results.items():
-        print(k, v)
+        print(k, None if v is None else DensityMatrix(v))
     print("\nDone. Note: this demo uses statevector/density-matrix math to show teleportation effect.")
 
 if __name__ == "__main__":